@@ -14,10 +14,13 @@ License: GNU GPL 3.0, see LICENSE
 
 import sys
 import datetime
+import functools
 from typing import Dict, List, Any, TextIO, Optional, Union
 
 
+@functools.lru_cache(maxsize=None)
 def get_system_username():
+    # the user doesn't change while the program runs, so the (system call heavy) lookup is only done once
     import getpass
     username = getpass.getuser()
     try:
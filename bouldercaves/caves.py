@@ -10,9 +10,11 @@ Written by Irmen de Jong (irmen@razorvine.net)
 License: GNU GPL 3.0, see LICENSE
 """
 
+import copy
 import math
 import random
-from typing import Sequence, List, Tuple, Union
+import functools
+from typing import Sequence, List, Tuple, Union, TypeVar
 from .objects import Direction, GameObject
 from . import objects, bdcff
 
@@ -20,151 +22,124 @@ from . import objects, bdcff
 BD1CAVES = [
     ("A - Intro",
      "Pick up jewels and exit before time is up.",
-     [0x01, 0x14, 0x0A, 0x0F, 0x0A, 0x0B, 0x0C, 0x0D, 0x0E, 0x0C, 0x0C, 0x0C, 0x0C, 0x0C, 0x96, 0x6E, 0x46, 0x28, 0x1E, 0x08, 0x0B, 0x09,
-      0xD4, 0x20, 0x00, 0x10, 0x14, 0x00, 0x3C, 0x32, 0x09, 0x00, 0x42, 0x01, 0x09, 0x1E, 0x02, 0x42, 0x09, 0x10, 0x1E, 0x02, 0x25, 0x03,
-      0x04, 0x04, 0x26, 0x12, 0xFF]
+     bytes.fromhex("01 14 0A 0F 0A 0B 0C 0D 0E 0C 0C 0C 0C 0C 96 6E 46 28 1E 08 0B 09 D4 20 00 10 14 00 3C 32 09 00 "
+                   "42 01 09 1E 02 42 09 10 1E 02 25 03 04 04 26 12 FF")
      ),
     ("B - Rooms",
      "Pick up jewels, but you must move boulders to get all jewels.",
-     [0x02, 0x14, 0x14, 0x32, 0x03, 0x00, 0x01, 0x57, 0x58, 0x0A, 0x0C, 0x09, 0x0D, 0x0A, 0x96, 0x6E, 0x46, 0x46, 0x46, 0x0A, 0x04, 0x09,
-      0x00, 0x00, 0x00, 0x10, 0x14, 0x08, 0x3C, 0x32, 0x09, 0x02, 0x42, 0x01, 0x08, 0x26, 0x02, 0x42, 0x01, 0x0F, 0x26, 0x02, 0x42, 0x08,
-      0x03, 0x14, 0x04, 0x42, 0x10, 0x03, 0x14, 0x04, 0x42, 0x18, 0x03, 0x14, 0x04, 0x42, 0x20, 0x03, 0x14, 0x04, 0x40, 0x01, 0x05, 0x26,
-      0x02, 0x40, 0x01, 0x0B, 0x26, 0x02, 0x40, 0x01, 0x12, 0x26, 0x02, 0x40, 0x14, 0x03, 0x14, 0x04, 0x25, 0x12, 0x15, 0x04, 0x12, 0x16,
-      0xFF]
+     bytes.fromhex("02 14 14 32 03 00 01 57 58 0A 0C 09 0D 0A 96 6E 46 46 46 0A 04 09 00 00 00 10 14 08 3C 32 09 02 "
+                   "42 01 08 26 02 42 01 0F 26 02 42 08 03 14 04 42 10 03 14 04 42 18 03 14 04 42 20 03 14 04 40 01 "
+                   "05 26 02 40 01 0B 26 02 40 01 12 26 02 40 14 03 14 04 25 12 15 04 12 16 FF")
      ),
     ("C - Maze",
      "Pick up jewels. You must get every jewel to exit.",
-     [0x03, 0x00, 0x0F, 0x00, 0x00, 0x32, 0x36, 0x34, 0x37, 0x18, 0x17, 0x18, 0x17, 0x15, 0x96, 0x64, 0x5A, 0x50, 0x46, 0x09, 0x08, 0x09,
-      0x04, 0x00, 0x02, 0x10, 0x14, 0x00, 0x64, 0x32, 0x09, 0x00, 0x25, 0x03, 0x04, 0x04, 0x27, 0x14, 0xFF]
+     bytes.fromhex("03 00 0F 00 00 32 36 34 37 18 17 18 17 15 96 64 5A 50 46 09 08 09 04 00 02 10 14 00 64 32 09 00 "
+                   "25 03 04 04 27 14 FF")
      ),
     ("D - Butterflies",
      "Drop boulders on butterflies to create jewels.",
-     [0x04, 0x14, 0x05, 0x14, 0x00, 0x6E, 0x70, 0x73, 0x77, 0x24, 0x24, 0x24, 0x24, 0x24, 0x78, 0x64, 0x50, 0x3C, 0x32, 0x04, 0x08, 0x09,
-      0x00, 0x00, 0x10, 0x00, 0x00, 0x00, 0x14, 0x00, 0x00, 0x00, 0x25, 0x01, 0x03, 0x04, 0x26, 0x16, 0x81, 0x08, 0x0A, 0x04, 0x04, 0x00,
-      0x30, 0x0A, 0x0B, 0x81, 0x10, 0x0A, 0x04, 0x04, 0x00, 0x30, 0x12, 0x0B, 0x81, 0x18, 0x0A, 0x04, 0x04, 0x00, 0x30, 0x1A, 0x0B, 0x81,
-      0x20, 0x0A, 0x04, 0x04, 0x00, 0x30, 0x22, 0x0B, 0xFF]
+     bytes.fromhex("04 14 05 14 00 6E 70 73 77 24 24 24 24 24 78 64 50 3C 32 04 08 09 00 00 10 00 00 00 14 00 00 00 "
+                   "25 01 03 04 26 16 81 08 0A 04 04 00 30 0A 0B 81 10 0A 04 04 00 30 12 0B 81 18 0A 04 04 00 30 1A "
+                   "0B 81 20 0A 04 04 00 30 22 0B FF")
      ),
     ("Intermission 1",
      "Bonus level!",
-     [0x11, 0x14, 0x1E, 0x00, 0x0A, 0x0B, 0x0C, 0x0D, 0x0E, 0x06, 0x06, 0x06, 0x06, 0x06, 0x0A, 0x0A, 0x0A, 0x0A, 0x0A, 0x0E, 0x02, 0x09,
-      0x00, 0x00, 0x00, 0x14, 0x00, 0x00, 0xFF, 0x09, 0x00, 0x00, 0x87, 0x00, 0x02, 0x28, 0x16, 0x07, 0x87, 0x00, 0x02, 0x14, 0x0C, 0x00,
-      0x32, 0x0A, 0x0C, 0x10, 0x0A, 0x04, 0x01, 0x0A, 0x05, 0x25, 0x03, 0x05, 0x04, 0x12, 0x0C, 0xFF]
+     bytes.fromhex("11 14 1E 00 0A 0B 0C 0D 0E 06 06 06 06 06 0A 0A 0A 0A 0A 0E 02 09 00 00 00 14 00 00 FF 09 00 00 "
+                   "87 00 02 28 16 07 87 00 02 14 0C 00 32 0A 0C 10 0A 04 01 0A 05 25 03 05 04 12 0C FF")
      ),
-
     ("E - Guards",
      "The jewels are there for grabbing, but they are guarded by the deadly fireflies.",
-     [0x05, 0x14, 0x32, 0x5A, 0x00, 0x00, 0x00, 0x00, 0x00, 0x04, 0x05, 0x06, 0x07, 0x08, 0x96, 0x78, 0x5A, 0x3C, 0x1E, 0x09, 0x0A, 0x09,
-      0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x25, 0x01, 0x03, 0x04, 0x27, 0x16, 0x80, 0x08, 0x0A, 0x03, 0x03, 0x00,
-      0x80, 0x10, 0x0A, 0x03, 0x03, 0x00, 0x80, 0x18, 0x0A, 0x03, 0x03, 0x00, 0x80, 0x20, 0x0A, 0x03, 0x03, 0x00, 0x14, 0x09, 0x0C, 0x08,
-      0x0A, 0x0A, 0x14, 0x11, 0x0C, 0x08, 0x12, 0x0A, 0x14, 0x19, 0x0C, 0x08, 0x1A, 0x0A, 0x14, 0x21, 0x0C, 0x08, 0x22, 0x0A, 0x80, 0x08,
-      0x10, 0x03, 0x03, 0x00, 0x80, 0x10, 0x10, 0x03, 0x03, 0x00, 0x80, 0x18, 0x10, 0x03, 0x03, 0x00, 0x80, 0x20, 0x10, 0x03, 0x03, 0x00,
-      0x14, 0x09, 0x12, 0x08, 0x0A, 0x10, 0x14, 0x11, 0x12, 0x08, 0x12, 0x10, 0x14, 0x19, 0x12, 0x08, 0x1A, 0x10, 0x14, 0x21, 0x12, 0x08,
-      0x22, 0x10, 0xFF]
+     bytes.fromhex("05 14 32 5A 00 00 00 00 00 04 05 06 07 08 96 78 5A 3C 1E 09 0A 09 00 00 00 00 00 00 00 00 00 00 "
+                   "25 01 03 04 27 16 80 08 0A 03 03 00 80 10 0A 03 03 00 80 18 0A 03 03 00 80 20 0A 03 03 00 14 09 "
+                   "0C 08 0A 0A 14 11 0C 08 12 0A 14 19 0C 08 1A 0A 14 21 0C 08 22 0A 80 08 10 03 03 00 80 10 10 03 "
+                   "03 00 80 18 10 03 03 00 80 20 10 03 03 00 14 09 12 08 0A 10 14 11 12 08 12 10 14 19 12 08 1A 10 "
+                   "14 21 12 08 22 10 FF")
      ),
     ("F - Firefly dens",
      "Each firefly is guarding a jewel.",
-     [0x06, 0x14, 0x28, 0x3C, 0x00, 0x14, 0x15, 0x16, 0x17, 0x04, 0x06, 0x07, 0x08, 0x08, 0x96, 0x78, 0x64, 0x5A, 0x50, 0x0E, 0x0A, 0x09,
-      0x00, 0x00, 0x10, 0x00, 0x00, 0x00, 0x32, 0x00, 0x00, 0x00, 0x82, 0x01, 0x03, 0x0A, 0x04, 0x00, 0x82, 0x01, 0x06, 0x0A, 0x04, 0x00,
-      0x82, 0x01, 0x09, 0x0A, 0x04, 0x00, 0x82, 0x01, 0x0C, 0x0A, 0x04, 0x00, 0x41, 0x0A, 0x03, 0x0D, 0x04, 0x14, 0x03, 0x05, 0x08, 0x04,
-      0x05, 0x14, 0x03, 0x08, 0x08, 0x04, 0x08, 0x14, 0x03, 0x0B, 0x08, 0x04, 0x0B, 0x14, 0x03, 0x0E, 0x08, 0x04, 0x0E, 0x82, 0x1D, 0x03,
-      0x0A, 0x04, 0x00, 0x82, 0x1D, 0x06, 0x0A, 0x04, 0x00, 0x82, 0x1D, 0x09, 0x0A, 0x04, 0x00, 0x82, 0x1D, 0x0C, 0x0A, 0x04, 0x00, 0x41,
-      0x1D, 0x03, 0x0D, 0x04, 0x14, 0x24, 0x05, 0x08, 0x23, 0x05, 0x14, 0x24, 0x08, 0x08, 0x23, 0x08, 0x14, 0x24, 0x0B, 0x08, 0x23, 0x0B,
-      0x14, 0x24, 0x0E, 0x08, 0x23, 0x0E, 0x25, 0x03, 0x14, 0x04, 0x26, 0x14, 0xFF]
+     bytes.fromhex("06 14 28 3C 00 14 15 16 17 04 06 07 08 08 96 78 64 5A 50 0E 0A 09 00 00 10 00 00 00 32 00 00 00 "
+                   "82 01 03 0A 04 00 82 01 06 0A 04 00 82 01 09 0A 04 00 82 01 0C 0A 04 00 41 0A 03 0D 04 14 03 05 "
+                   "08 04 05 14 03 08 08 04 08 14 03 0B 08 04 0B 14 03 0E 08 04 0E 82 1D 03 0A 04 00 82 1D 06 0A 04 "
+                   "00 82 1D 09 0A 04 00 82 1D 0C 0A 04 00 41 1D 03 0D 04 14 24 05 08 23 05 14 24 08 08 23 08 14 24 "
+                   "0B 08 23 0B 14 24 0E 08 23 0E 25 03 14 04 26 14 FF")
      ),
     ("G - Amoeba",
      "Surround the amoeba with boulders. Pick up jewels when it suffocates.",
-     [0x07, 0x4B, 0x0A, 0x14, 0x02, 0x07, 0x08, 0x0A, 0x09, 0x0F, 0x14, 0x19, 0x19, 0x19, 0x78, 0x78, 0x78, 0x78, 0x78, 0x09, 0x0A, 0x0D,
-      0x00, 0x00, 0x00, 0x10, 0x08, 0x00, 0x64, 0x28, 0x02, 0x00, 0x42, 0x01, 0x07, 0x0C, 0x02, 0x42, 0x1C, 0x05, 0x0B, 0x02, 0x7A, 0x13,
-      0x15, 0x02, 0x02, 0x14, 0x04, 0x06, 0x14, 0x04, 0x0E, 0x14, 0x04, 0x16, 0x14, 0x22, 0x04, 0x14, 0x22, 0x0C, 0x14, 0x22, 0x16, 0x25,
-      0x14, 0x03, 0x04, 0x27, 0x07, 0xFF]
+     bytes.fromhex("07 4B 0A 14 02 07 08 0A 09 0F 14 19 19 19 78 78 78 78 78 09 0A 0D 00 00 00 10 08 00 64 28 02 00 "
+                   "42 01 07 0C 02 42 1C 05 0B 02 7A 13 15 02 02 14 04 06 14 04 0E 14 04 16 14 22 04 14 22 0C 14 22 "
+                   "16 25 14 03 04 27 07 FF")
      ),
     ("H - Enchanted wall",
      "Activate the enchanted wall and create as many jewels as you can.",
-     [0x08, 0x14, 0x0A, 0x14, 0x01, 0x03, 0x04, 0x05, 0x06, 0x0A, 0x0F, 0x14, 0x14, 0x14, 0x78, 0x6E, 0x64, 0x5A, 0x50, 0x02, 0x0E, 0x09,
-      0x00, 0x00, 0x00, 0x10, 0x08, 0x00, 0x5A, 0x32, 0x02, 0x00, 0x14, 0x04, 0x06, 0x14, 0x22, 0x04, 0x14, 0x22, 0x0C, 0x04, 0x00, 0x05,
-      0x25, 0x14, 0x03, 0x42, 0x01, 0x07, 0x0C, 0x02, 0x42, 0x01, 0x0F, 0x0C, 0x02, 0x42, 0x1C, 0x05, 0x0B, 0x02, 0x42, 0x1C, 0x0D, 0x0B,
-      0x02, 0x43, 0x0E, 0x11, 0x08, 0x02, 0x14, 0x0C, 0x10, 0x00, 0x0E, 0x12, 0x14, 0x13, 0x12, 0x41, 0x0E, 0x0F, 0x08, 0x02, 0xFF]
+     bytes.fromhex("08 14 0A 14 01 03 04 05 06 0A 0F 14 14 14 78 6E 64 5A 50 02 0E 09 00 00 00 10 08 00 5A 32 02 00 "
+                   "14 04 06 14 22 04 14 22 0C 04 00 05 25 14 03 42 01 07 0C 02 42 01 0F 0C 02 42 1C 05 0B 02 42 1C "
+                   "0D 0B 02 43 0E 11 08 02 14 0C 10 00 0E 12 14 13 12 41 0E 0F 08 02 FF")
      ),
     ("Intermission 2",
      "Bonus level!",
-     [0x12, 0x14, 0x0A, 0x00, 0x0A, 0x0B, 0x0C, 0x0D, 0x0E, 0x10, 0x10, 0x10, 0x10, 0x10, 0x0F, 0x0F, 0x0F, 0x0F, 0x0F, 0x06, 0x0F, 0x09,
-      0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x87, 0x00, 0x02, 0x28, 0x16, 0x07, 0x87, 0x00, 0x02, 0x14, 0x0C, 0x01,
-      0x50, 0x01, 0x03, 0x09, 0x03, 0x48, 0x02, 0x03, 0x08, 0x03, 0x54, 0x01, 0x05, 0x08, 0x03, 0x50, 0x01, 0x06, 0x07, 0x03, 0x50, 0x12,
-      0x03, 0x09, 0x05, 0x54, 0x12, 0x05, 0x08, 0x05, 0x50, 0x12, 0x06, 0x07, 0x05, 0x25, 0x01, 0x04, 0x04, 0x12, 0x04, 0xFF]
+     bytes.fromhex("12 14 0A 00 0A 0B 0C 0D 0E 10 10 10 10 10 0F 0F 0F 0F 0F 06 0F 09 00 00 00 00 00 00 00 00 00 00 "
+                   "87 00 02 28 16 07 87 00 02 14 0C 01 50 01 03 09 03 48 02 03 08 03 54 01 05 08 03 50 01 06 07 03 "
+                   "50 12 03 09 05 54 12 05 08 05 50 12 06 07 05 25 01 04 04 12 04 FF")
      ),
-
     ("I - Greed",
      "You have to get a lot of jewels here, lucky there are so many.",
-     [0x09, 0x14, 0x05, 0x0A, 0x64, 0x89, 0x8C, 0xFB, 0x33, 0x4B, 0x4B, 0x50, 0x55, 0x5A, 0x96, 0x96, 0x82, 0x82, 0x78, 0x08, 0x04, 0x09,
-      0x00, 0x00, 0x10, 0x14, 0x00, 0x00, 0xF0, 0x78, 0x00, 0x00, 0x82, 0x05, 0x0A, 0x0D, 0x0D, 0x00, 0x01, 0x0C, 0x0A, 0x82, 0x19, 0x0A,
-      0x0D, 0x0D, 0x00, 0x01, 0x1F, 0x0A, 0x42, 0x11, 0x12, 0x09, 0x02, 0x40, 0x11, 0x13, 0x09, 0x02, 0x25, 0x07, 0x0C, 0x04, 0x08, 0x0C,
-      0xFF]
+     bytes.fromhex("09 14 05 0A 64 89 8C FB 33 4B 4B 50 55 5A 96 96 82 82 78 08 04 09 00 00 10 14 00 00 F0 78 00 00 "
+                   "82 05 0A 0D 0D 00 01 0C 0A 82 19 0A 0D 0D 00 01 1F 0A 42 11 12 09 02 40 11 13 09 02 25 07 0C 04 "
+                   "08 0C FF")
      ),
     ("J - Tracks",
      "Get the jewels, avoid the fireflies.",
-     [0x0A, 0x14, 0x19, 0x3C, 0x00, 0x00, 0x00, 0x00, 0x00, 0x0C, 0x0C, 0x0C, 0x0C, 0x0C, 0x96, 0x82, 0x78, 0x6E, 0x64, 0x06, 0x08, 0x09,
-      0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x25, 0x0D, 0x03, 0x04, 0x27, 0x16, 0x54, 0x05, 0x04, 0x11, 0x03, 0x54,
-      0x15, 0x04, 0x11, 0x05, 0x80, 0x05, 0x0B, 0x11, 0x03, 0x08, 0xC2, 0x01, 0x04, 0x15, 0x11, 0x00, 0x0D, 0x04, 0xC2, 0x07, 0x06, 0x0D,
-      0x0D, 0x00, 0x0D, 0x06, 0xC2, 0x09, 0x08, 0x09, 0x09, 0x00, 0x0D, 0x08, 0xC2, 0x0B, 0x0A, 0x05, 0x05, 0x00, 0x0D, 0x0A, 0x82, 0x03,
-      0x06, 0x03, 0x0F, 0x08, 0x00, 0x04, 0x06, 0x54, 0x04, 0x10, 0x04, 0x04, 0xFF]
+     bytes.fromhex("0A 14 19 3C 00 00 00 00 00 0C 0C 0C 0C 0C 96 82 78 6E 64 06 08 09 00 00 00 00 00 00 00 00 00 00 "
+                   "25 0D 03 04 27 16 54 05 04 11 03 54 15 04 11 05 80 05 0B 11 03 08 C2 01 04 15 11 00 0D 04 C2 07 "
+                   "06 0D 0D 00 0D 06 C2 09 08 09 09 00 0D 08 C2 0B 0A 05 05 00 0D 0A 82 03 06 03 0F 08 00 04 06 54 "
+                   "04 10 04 04 FF")
      ),
     ("K - Crowd",
      "You must move a lot of boulders around in some tight spaces.",
-     [0x0B, 0x14, 0x32, 0x00, 0x00, 0x04, 0x66, 0x97, 0x64, 0x06, 0x06, 0x06, 0x06, 0x06, 0x78, 0x78, 0x96, 0x96, 0xF0, 0x0B, 0x08, 0x09,
-      0x00, 0x00, 0x00, 0x10, 0x08, 0x00, 0x64, 0x50, 0x02, 0x00, 0x42, 0x0A, 0x03, 0x09, 0x04, 0x42, 0x14, 0x03, 0x09, 0x04, 0x42, 0x1E,
-      0x03, 0x09, 0x04, 0x42, 0x09, 0x16, 0x09, 0x00, 0x42, 0x0C, 0x0F, 0x11, 0x02, 0x42, 0x05, 0x0B, 0x09, 0x02, 0x42, 0x0F, 0x0B, 0x09,
-      0x02, 0x42, 0x19, 0x0B, 0x09, 0x02, 0x42, 0x1C, 0x13, 0x0B, 0x01, 0x14, 0x04, 0x03, 0x14, 0x0E, 0x03, 0x14, 0x18, 0x03, 0x14, 0x22,
-      0x03, 0x14, 0x04, 0x16, 0x14, 0x23, 0x15, 0x25, 0x14, 0x14, 0x04, 0x26, 0x11, 0xFF]
+     bytes.fromhex("0B 14 32 00 00 04 66 97 64 06 06 06 06 06 78 78 96 96 F0 0B 08 09 00 00 00 10 08 00 64 50 02 00 "
+                   "42 0A 03 09 04 42 14 03 09 04 42 1E 03 09 04 42 09 16 09 00 42 0C 0F 11 02 42 05 0B 09 02 42 0F "
+                   "0B 09 02 42 19 0B 09 02 42 1C 13 0B 01 14 04 03 14 0E 03 14 18 03 14 22 03 14 04 16 14 23 15 25 "
+                   "14 14 04 26 11 FF")
      ),
     ("L - Walls",
      "Drop a boulder on a firefly at the right time to blast through walls.",
-     [0x0C, 0x14, 0x14, 0x00, 0x00, 0x3C, 0x02, 0x3B, 0x66, 0x13, 0x13, 0x0E, 0x10, 0x15, 0xB4, 0xAA, 0xA0, 0xA0, 0xA0, 0x0C, 0x0A, 0x09,
-      0x00, 0x00, 0x00, 0x10, 0x14, 0x00, 0x3C, 0x32, 0x09, 0x00, 0x42, 0x0A, 0x05, 0x12, 0x04, 0x42, 0x0E, 0x05, 0x12, 0x04, 0x42, 0x12,
-      0x05, 0x12, 0x04, 0x42, 0x16, 0x05, 0x12, 0x04, 0x42, 0x02, 0x06, 0x0B, 0x02, 0x42, 0x02, 0x0A, 0x0B, 0x02, 0x42, 0x02, 0x0E, 0x0F,
-      0x02, 0x42, 0x02, 0x12, 0x0B, 0x02, 0x81, 0x1E, 0x04, 0x04, 0x04, 0x00, 0x08, 0x20, 0x05, 0x81, 0x1E, 0x09, 0x04, 0x04, 0x00, 0x08,
-      0x20, 0x0A, 0x81, 0x1E, 0x0E, 0x04, 0x04, 0x00, 0x08, 0x20, 0x0F, 0x25, 0x03, 0x14, 0x04, 0x27, 0x16, 0xFF]
+     bytes.fromhex("0C 14 14 00 00 3C 02 3B 66 13 13 0E 10 15 B4 AA A0 A0 A0 0C 0A 09 00 00 00 10 14 00 3C 32 09 00 "
+                   "42 0A 05 12 04 42 0E 05 12 04 42 12 05 12 04 42 16 05 12 04 42 02 06 0B 02 42 02 0A 0B 02 42 02 "
+                   "0E 0F 02 42 02 12 0B 02 81 1E 04 04 04 00 08 20 05 81 1E 09 04 04 00 08 20 0A 81 1E 0E 04 04 00 "
+                   "08 20 0F 25 03 14 04 27 16 FF")
      ),
     ("Intermission 3",
      "Bonus level!",
-     [0x13, 0x04, 0x0A, 0x00, 0x0A, 0x0B, 0x0C, 0x0D, 0x0E, 0x0E, 0x0E, 0x0E, 0x0E, 0x0E, 0x14, 0x14, 0x14, 0x14, 0x14, 0x06, 0x08, 0x09,
-      0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x87, 0x00, 0x02, 0x28, 0x16, 0x07, 0x87, 0x00, 0x02, 0x14, 0x0C, 0x00,
-      0x54, 0x01, 0x0C, 0x12, 0x02, 0x88, 0x0F, 0x09, 0x04, 0x04, 0x08, 0x25, 0x08, 0x03, 0x04, 0x12, 0x07, 0xFF]
+     bytes.fromhex("13 04 0A 00 0A 0B 0C 0D 0E 0E 0E 0E 0E 0E 14 14 14 14 14 06 08 09 00 00 00 00 00 00 00 00 00 00 "
+                   "87 00 02 28 16 07 87 00 02 14 0C 00 54 01 0C 12 02 88 0F 09 04 04 08 25 08 03 04 12 07 FF")
      ),
-
     ("M - Apocalypse",
      "Bring the butterflies and amoeba together and watch the jewels fly.",
-     [0x0D, 0x8C, 0x05, 0x08, 0x00, 0x01, 0x02, 0x03, 0x04, 0x32, 0x37, 0x3C, 0x46, 0x50, 0xA0, 0x9B, 0x96, 0x91, 0x8C, 0x06, 0x08, 0x0D,
-      0x00, 0x00, 0x10, 0x00, 0x00, 0x00, 0x28, 0x00, 0x00, 0x00, 0x25, 0x12, 0x03, 0x04, 0x0A, 0x03, 0x3A, 0x14, 0x03, 0x42, 0x05, 0x12,
-      0x1E, 0x02, 0x70, 0x05, 0x13, 0x1E, 0x02, 0x50, 0x05, 0x14, 0x1E, 0x02, 0xC1, 0x05, 0x15, 0x1E, 0x02, 0xFF]
+     bytes.fromhex("0D 8C 05 08 00 01 02 03 04 32 37 3C 46 50 A0 9B 96 91 8C 06 08 0D 00 00 10 00 00 00 28 00 00 00 "
+                   "25 12 03 04 0A 03 3A 14 03 42 05 12 1E 02 70 05 13 1E 02 50 05 14 1E 02 C1 05 15 1E 02 FF")
      ),
     ("N - Zigzag",
      "Magically transform the butterflies into jewels, but don't waste any boulders.",
-     [0x0E, 0x14, 0x0A, 0x14, 0x00, 0x00, 0x00, 0x00, 0x00, 0x1E, 0x23, 0x28, 0x2A, 0x2D, 0x96, 0x91, 0x8C, 0x87, 0x82, 0x0C, 0x08, 0x09,
-      0x00, 0x00, 0x10, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x81, 0x0A, 0x0A, 0x0D, 0x0D, 0x00, 0x70, 0x0B, 0x0B, 0x0C, 0x03, 0xC1,
-      0x0C, 0x0A, 0x03, 0x0D, 0xC1, 0x10, 0x0A, 0x03, 0x0D, 0xC1, 0x14, 0x0A, 0x03, 0x0D, 0x50, 0x16, 0x08, 0x0C, 0x02, 0x48, 0x16, 0x07,
-      0x0C, 0x02, 0xC1, 0x17, 0x06, 0x03, 0x04, 0xC1, 0x1B, 0x06, 0x03, 0x04, 0xC1, 0x1F, 0x06, 0x03, 0x04, 0x25, 0x03, 0x03, 0x04, 0x27,
-      0x14, 0xFF]
+     bytes.fromhex("0E 14 0A 14 00 00 00 00 00 1E 23 28 2A 2D 96 91 8C 87 82 0C 08 09 00 00 10 00 00 00 00 00 00 00 "
+                   "81 0A 0A 0D 0D 00 70 0B 0B 0C 03 C1 0C 0A 03 0D C1 10 0A 03 0D C1 14 0A 03 0D 50 16 08 0C 02 48 "
+                   "16 07 0C 02 C1 17 06 03 04 C1 1B 06 03 04 C1 1F 06 03 04 25 03 03 04 27 14 FF")
      ),
     ("O - Funnel",
      "There is an enchanted wall at the bottom of the rock tunnel.",
-     [0x0F, 0x08, 0x0A, 0x14, 0x01, 0x1D, 0x1E, 0x1F, 0x20, 0x0F, 0x14, 0x14, 0x19, 0x1E, 0x78, 0x78, 0x78, 0x78, 0x8C, 0x08, 0x0E, 0x09,
-      0x00, 0x00, 0x00, 0x10, 0x08, 0x00, 0x64, 0x50, 0x02, 0x00, 0x42, 0x02, 0x04, 0x0A, 0x03, 0x42, 0x0F, 0x0D, 0x0A, 0x01, 0x41, 0x0C,
-      0x0E, 0x03, 0x02, 0x43, 0x0C, 0x0F, 0x03, 0x02, 0x04, 0x14, 0x16, 0x25, 0x14, 0x03, 0xFF]
+     bytes.fromhex("0F 08 0A 14 01 1D 1E 1F 20 0F 14 14 19 1E 78 78 78 78 8C 08 0E 09 00 00 00 10 08 00 64 50 02 00 "
+                   "42 02 04 0A 03 42 0F 0D 0A 01 41 0C 0E 03 02 43 0C 0F 03 02 04 14 16 25 14 03 FF")
      ),
     ("P - Enchanted boxes",
      "The top of each room is an enchanted wall, but you'll have to blast your way inside.",
-     [0x10, 0x14, 0x0A, 0x14, 0x01, 0x78, 0x81, 0x7E, 0x7B, 0x0C, 0x0F, 0x0F, 0x0F, 0x0C, 0x96, 0x96, 0x96, 0x96, 0x96, 0x09, 0x0A, 0x09,
-      0x00, 0x00, 0x10, 0x00, 0x00, 0x00, 0x32, 0x00, 0x00, 0x00, 0x25, 0x01, 0x03, 0x04, 0x27, 0x04, 0x81, 0x08, 0x13, 0x04, 0x04, 0x00,
-      0x08, 0x0A, 0x14, 0xC2, 0x07, 0x0A, 0x06, 0x08, 0x43, 0x07, 0x0A, 0x06, 0x02, 0x81, 0x10, 0x13, 0x04, 0x04, 0x00, 0x08, 0x12, 0x14,
-      0xC2, 0x0F, 0x0A, 0x06, 0x08, 0x43, 0x0F, 0x0A, 0x06, 0x02, 0x81, 0x18, 0x13, 0x04, 0x04, 0x00, 0x08, 0x1A, 0x14, 0x81, 0x20, 0x13,
-      0x04, 0x04, 0x00, 0x08, 0x22, 0x14, 0xFF]
+     bytes.fromhex("10 14 0A 14 01 78 81 7E 7B 0C 0F 0F 0F 0C 96 96 96 96 96 09 0A 09 00 00 10 00 00 00 32 00 00 00 "
+                   "25 01 03 04 27 04 81 08 13 04 04 00 08 0A 14 C2 07 0A 06 08 43 07 0A 06 02 81 10 13 04 04 00 08 "
+                   "12 14 C2 0F 0A 06 08 43 0F 0A 06 02 81 18 13 04 04 00 08 1A 14 81 20 13 04 04 00 08 22 14 FF")
      ),
     ("Intermission 4",
      "Bonus level!",
-     [0x14, 0x03, 0x1E, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x06, 0x06, 0x06, 0x06, 0x06, 0x14, 0x14, 0x14, 0x14, 0x14, 0x06, 0x08, 0x09,
-      0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x87, 0x00, 0x02, 0x28, 0x16, 0x07, 0x87, 0x00, 0x02, 0x14, 0x0C, 0x01,
-      0xD0, 0x0B, 0x03, 0x03, 0x02, 0x80, 0x0B, 0x07, 0x03, 0x06, 0x00, 0x43, 0x0B, 0x06, 0x03, 0x02, 0x43, 0x0B, 0x0A, 0x03, 0x02, 0x50,
-      0x08, 0x07, 0x03, 0x03, 0x25, 0x03, 0x03, 0x04, 0x09, 0x0A, 0xFF]
+     bytes.fromhex("14 03 1E 00 00 00 00 00 00 06 06 06 06 06 14 14 14 14 14 06 08 09 00 00 00 00 00 00 00 00 00 00 "
+                   "87 00 02 28 16 07 87 00 02 14 0C 01 D0 0B 03 03 02 80 0B 07 03 06 00 43 0B 06 03 02 43 0B 0A 03 "
+                   "02 50 08 07 03 03 25 03 03 04 09 0A FF")
      )
 ]
 
@@ -176,12 +151,8 @@ BD1CAVES = [
 # The demo finishes when it hits $00. So for example,
 # $FF means no movement for 15 turns, $1E means move up one space, $77 means move right 7 spaces, etc.
 # (details: https://www.elmerproductions.com/sp/peterb/insideBoulderdash.html)
-CAVE_A_DEMO = [
-    0x4F, 0x1E, 0x77, 0x2D, 0x97, 0x4F, 0x2D, 0x47, 0x3E, 0x1B, 0x4F, 0x1E, 0xB7, 0x1D, 0x27,
-    0x4F, 0x6D, 0x17, 0x4D, 0x3B, 0x4F, 0x1D, 0x1B, 0x47, 0x3B, 0x4F, 0x4E, 0x5B, 0x3E, 0x5B, 0x4D,
-    0x3B, 0x5F, 0x3E, 0xAB, 0x1E, 0x3B, 0x1D, 0x6B, 0x4D, 0x17, 0x4F, 0x3D, 0x47, 0x4D, 0x4B, 0x2E,
-    0x27, 0x3E, 0xA7, 0xA7, 0x1D, 0x47, 0x1D, 0x47, 0x2D, 0x5F, 0x57, 0x4E, 0x57, 0x6F, 0x1D, 0x00
-]
+CAVE_A_DEMO = bytes.fromhex("4F 1E 77 2D 97 4F 2D 47 3E 1B 4F 1E B7 1D 27 4F 6D 17 4D 3B 4F 1D 1B 47 3B 4F 4E 5B 3E 5B 4D 3B "
+                            "5F 3E AB 1E 3B 1D 6B 4D 17 4F 3D 47 4D 4B 2E 27 3E A7 A7 1D 47 1D 47 2D 5F 57 4E 57 6F 1D 00")
 
 colorpalette_contrast = (  # this is a Commodore-64 palette with more contrast
     0x000000,  # 0 = black
@@ -244,6 +215,10 @@ colorpalette = colorpalette_pepto           # select desired color palette here
 
 
 class Palette:
+    color_names = ("fg1", "fg2", "fg3", "amoeba", "slime", "screen", "border")
+    # the rgb_xxx attributes hold the 0xRRGGBB value of each palette color, they're updated whenever a color is set
+    rgb_fg1 = rgb_fg2 = rgb_fg3 = rgb_amoeba = rgb_slime = rgb_screen = rgb_border = 0
+
     def __init__(self, fg1: Union[int, str]=8, fg2: Union[int, str]=11, fg3: Union[int, str]=1,
                  amoeba: Union[int, str]=5, slime: Union[int, str]=6, screen: Union[int, str]=0, border: Union[int, str]=0) -> None:
         self.fg1 = self._color(fg1)
@@ -254,6 +229,11 @@ class Palette:
         self.screen = self._color(screen)
         self.border = self._color(border)
 
+    def __setattr__(self, name: str, value: Union[int, str]) -> None:
+        super().__setattr__(name, value)
+        if name in self.color_names:
+            super().__setattr__("rgb_" + name, self._rgb(value))
+
     def __str__(self):
         return "<Palette fg1={fg1}, fg2={fg2}, fg3={fg3}, amoeba={amoeba}, slime={slime}, screen={screen}, border={border}>"\
             .format(**vars(self))
@@ -262,17 +242,8 @@ class Palette:
         return Palette(self.fg1, self.fg2, self.fg3, self.amoeba, self.slime, self.screen, self.border)
 
     def randomize(self) -> None:
-        available = list(range(1, len(colorpalette)))
-        self.fg1 = random.choice(available)
-        available.remove(self.fg1)
-        self.fg2 = random.choice(available)
-        available.remove(self.fg2)
-        self.fg3 = random.choice(available)
-        available.remove(self.fg3)
-        self.slime = random.choice(available)
-        available.remove(self.slime)
-        self.amoeba = random.choice(available)
-        available.remove(self.amoeba)
+        # pick 5 different colors, leaving out black (color 0)
+        self.fg1, self.fg2, self.fg3, self.slime, self.amoeba = random.sample(range(1, len(colorpalette)), 5)
         self.screen = self.border = 0
 
     def _color(self, color: Union[int, str]) -> Union[int, str]:
@@ -292,33 +263,11 @@ class Palette:
             return int(color[1:], 16)
         return colorpalette[int(color)]
 
-    @property
-    def rgb_fg1(self):
-        return self._rgb(self.fg1)
 
-    @property
-    def rgb_fg2(self):
-        return self._rgb(self.fg2)
+CaveType = TypeVar("CaveType", bound="Cave")
 
-    @property
-    def rgb_fg3(self):
-        return self._rgb(self.fg3)
-
-    @property
-    def rgb_amoeba(self):
-        return self._rgb(self.amoeba)
-
-    @property
-    def rgb_slime(self):
-        return self._rgb(self.slime)
-
-    @property
-    def rgb_screen(self):
-        return self._rgb(self.screen)
-
-    @property
-    def rgb_border(self):
-        return self._rgb(self.border)
+# the default cave properties from the Bdcff specification (read-only, shared by all caves)
+_CAVE_DEFAULTS = bdcff.BdcffCave()
 
 
 class Cave:
@@ -333,7 +282,7 @@ class Cave:
         self.width = width
         self.height = height
         self.map = []       # type: List[Tuple[GameObject, Direction]]
-        defaults = bdcff.BdcffCave()
+        defaults = _CAVE_DEFAULTS
         self.magicwall_millingtime = defaults.magicwalltime
         self.amoeba_slowgrowthtime = defaults.amoebatime
         self.diamondvalue_normal = defaults.diamondvalue_normal
@@ -345,19 +294,20 @@ class Cave:
         self.time = defaults.cavetime
         self.colors = Palette()
 
+    def copy(self: CaveType) -> CaveType:
+        cave = copy.copy(self)
+        cave.map = self.map.copy()
+        cave.colors = self.colors.copy()
+        return cave
+
     def resize(self, target_width: int, target_height: int) -> None:
         # make the map bigger, place the original in the center
-        map2 = []
-        filler = [(objects.EMPTY, Direction.NOWHERE)] * target_width
-        for y in range(math.floor((target_height - self.height) / 2)):
-            map2.extend(filler)
-        for y in range(self.height):
-            map2.extend(filler[:math.floor((target_width-self.width)/2)])
-            map2.extend(self.map[y * self.width: y * self.width + self.width])
-            map2.extend(filler[:math.ceil((target_width-self.width)/2)])
-        for y in range(math.ceil((target_height - self.height) / 2)):
-            map2.extend(filler)
-        assert len(map2) == target_width * target_height
+        assert target_width >= self.width and target_height >= self.height
+        map2 = [EMPTY_CELL] * (target_width * target_height)
+        offset = math.floor((target_height - self.height) / 2) * target_width + math.floor((target_width - self.width) / 2)
+        for y in range(0, self.width * self.height, self.width):
+            map2[offset: offset + self.width] = self.map[y: y + self.width]
+            offset += target_width
         self.width, self.height = target_width, target_height
         self.map = map2
 
@@ -367,15 +317,26 @@ class C64Cave(Cave):
         super().__init__(index, name, description, width, height)
         self.codemap = bytearray()
         self.randomseed = 0
-        self.random_objects = (0, 0, 0, 0)
-        self.random_probabilities = (0, 0, 0, 0)
+        self.random_objects = bytes(4)
+        self.random_probabilities = bytes(4)
+        self.has_amoeba = False
 
     @classmethod
     def decode_from_lvl(cls, levelnumber: int) -> 'C64Cave':
         assert 0 < levelnumber <= len(BD1CAVES)
+        # The built-in caves never change, so they're only decoded once and copied after that.
+        # The cached cave only keeps the compact codemap, the map of objects is recreated from it for every copy.
+        # The copy gets its own codemap too, so drawing on it doesn't change the cached cave.
+        cave = cls._decode_from_lvl_cached(levelnumber).copy()
+        cave.convert_codemap()
+        cave.codemap = bytearray(cave.codemap)
+        return cave
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _decode_from_lvl_cached(cls, levelnumber: int) -> 'C64Cave':
         name, description, data = BD1CAVES[levelnumber - 1]
         cave = cls(data[0], name, description, 40, 22)   # size is hardcoded, also for intermissions
-        cave.codemap = bytearray(cave.width * cave.height)
         cave.intermission = name.lower().startswith("intermission")
         cave.magicwall_millingtime = cave.amoeba_slowgrowthtime = data[0x01]
         cave.diamondvalue_normal = data[0x02]
@@ -384,132 +345,117 @@ class C64Cave(Cave):
         cave.diamonds_required = data[0x09]
         cave.time = data[0x0e]
         cave.colors = Palette(data[0x13], data[0x14], 1, data[0x15])
-        cave.random_objects = data[0x18], data[0x19], data[0x1a], data[0x1b]
-        cave.random_probabilities = data[0x1c], data[0x1d], data[0x1e], data[0x1f]
+        cave.random_objects = data[0x18:0x1c]
+        cave.random_probabilities = data[0x1c:0x20]
         cave.amoebafactor = 0.2273
         cave.build_map(data[0x20:])
         # if map contains amoeba, the fg3 color is not white but instead the amoeba color.
-        if any(m[0] == objects.AMOEBA for m in cave.map):
+        if cave.has_amoeba:
             cave.colors.fg3 = cave.colors.amoeba
         return cave
 
     @staticmethod
-    def bdrandom(seeds: List[int]) -> None:
-        # the pseudo random generator that Boulder Dash uses
-        assert len(seeds) == 2, "expected 2 seed numbers"
-        assert 0 <= seeds[0] <= 0xFF, "expected seed 0 to be between 0 and 0xFF"
-        assert 0 <= seeds[1] <= 0xFF, "expected seed 1 to be between 0 and 0xFF"
-        tmp1 = (seeds[0] & 0x0001) * 0x0080
-        tmp2 = (seeds[1] >> 1) & 0x007F
-        result = seeds[1] + (seeds[1] & 0x0001) * 0x0080
-        carry = (result > 0x00FF)
-        result = result & 0x00FF
-        result = result + carry + 0x13
-        carry = (result > 0x00FF)
-        seeds[1] = result & 0x00FF
-        result = seeds[0] + carry + tmp1
-        carry = (result > 0x00FF)
-        result = result & 0x00FF
-        result = result + carry + tmp2
-        seeds[0] = result & 0x00FF
-        assert 0 <= seeds[0] <= 0xFF, "expected seed 0 to STILL be between 0 and 0xFF"
-        assert 0 <= seeds[1] <= 0xFF, "expected seed 0 to STILL be between 0 and 0xFF"
+    def bdrandom_sequence(seed: int, count: int) -> bytes:
+        # the random numbers of the Boulder Dash pseudo random generator started with seeds (0, seed), as used for the random cave fill
+        return _random_numbers(seed, count)
 
     def build_map(self, data: Sequence[int]) -> None:
-        seeds = [0, self.randomseed]
-        for y in range(1, self.height - 1):
-            for x in range(0, self.width):
-                obj = 0x01   # DIRT
-                self.bdrandom(seeds)
-                for randomobj, randomprob in zip(self.random_objects, self.random_probabilities):
-                    if seeds[0] < randomprob:
-                        obj = randomobj
-                self.draw_single(obj, x, y)
-        self.draw_rectangle(0x07, 0, 0, self.width, self.height)    # STEEL boundary
+        self.codemap = _random_fill(self.randomseed, self.random_objects, self.random_probabilities, self.width, self.height)
 
+        codemap, cavewidth = self.codemap, self.width
         n = 0
         while n < len(data) and data[n] < 0xff:
-            obj = data[n] & 0x3f
-            kind = (data[n] & 0xc0) >> 6
-            x = data[n + 1]
-            y = data[n + 2] - 2   # apparently need to adjust for top 2 lines where score is shown on c64
-            if kind == 0:
-                self.draw_single(obj, x, y)
+            if data[n] < 0x40:
+                # single object, the most common instruction: draw_single, inlined
+                codemap[data[n + 1] + (data[n + 2] - 2) * cavewidth] = data[n]
                 n += 3
-            elif kind == 1:
-                length = data[n + 3]
-                direction = data[n + 4]
-                self.draw_line(obj, x, y, length, direction)
-                n += 5
-            elif kind == 2:
-                width = data[n + 3]
-                height = data[n + 4]
-                fillobject = data[n + 5]
-                self.draw_rectangle(obj, x, y, width, height, fillobject)
-                n += 6
-            elif kind == 3:
-                width = data[n + 3]
-                height = data[n + 4]
-                self.draw_rectangle(obj, x, y, width, height)
-                n += 5
-            else:
-                raise ValueError("invalid cave instruction encountered")
+                continue
+            draw, length = self.instructions[data[n] >> 6]
+            code, x, y, *arguments = data[n: n + length]
+            y -= 2   # apparently need to adjust for top 2 lines where score is shown on c64
+            draw(self, code & 0x3f, x, y, *arguments)
+            n += length
+
+        self.has_amoeba = 0x3a in self.codemap    # AMOEBA
 
+    def convert_codemap(self) -> None:
         # convert the c64 cave map codes to objects we recognise
-        conversion = {
-            0x00: (objects.EMPTY, Direction.NOWHERE),
-            0x01: (objects.DIRT, Direction.NOWHERE),
-            0x02: (objects.BRICK, Direction.NOWHERE),
-            0x03: (objects.MAGICWALL, Direction.NOWHERE),
-            0x04: (objects.OUTBOXCLOSED, Direction.NOWHERE),
-            0x05: (objects.OUTBOXBLINKING, Direction.NOWHERE),
-            0x07: (objects.STEEL, Direction.NOWHERE),
-            0x08: (objects.FIREFLY, Direction.LEFT),
-            0x09: (objects.FIREFLY, Direction.UP),
-            0x0a: (objects.FIREFLY, Direction.RIGHT),
-            0x0b: (objects.FIREFLY, Direction.DOWN),
-            0x10: (objects.BOULDER, Direction.NOWHERE),
-            0x12: (objects.BOULDER, Direction.NOWHERE),
-            0x14: (objects.DIAMOND, Direction.NOWHERE),
-            0x16: (objects.DIAMOND, Direction.NOWHERE),
-            0x25: (objects.INBOXBLINKING, Direction.NOWHERE),
-            0x30: (objects.BUTTERFLY, Direction.DOWN),
-            0x31: (objects.BUTTERFLY, Direction.LEFT),
-            0x32: (objects.BUTTERFLY, Direction.UP),
-            0x33: (objects.BUTTERFLY, Direction.RIGHT),
-            0x38: (objects.ROCKFORD, Direction.NOWHERE),
-            0x3a: (objects.AMOEBA, Direction.NOWHERE)
-        }
-        self.map = [conversion[code] for code in self.codemap]
-        del self.codemap
+        cavemap = list(map(C64OBJECTS_TABLE.__getitem__, self.codemap))
+        if None in cavemap:
+            raise ValueError("invalid cave map code encountered")
+        self.map = cavemap      # type: ignore
 
     def draw_rectangle(self, obj: int, x1: int, y1: int, width: int, height: int, fillobject: int=None) -> None:
-        self.draw_line(obj, x1, y1, width, 2)
-        self.draw_line(obj, x1, y1 + height - 1, width, 2)
-        self.draw_line(obj, x1, y1 + 1, height - 2, 4)
-        self.draw_line(obj, x1 + width - 1, y1 + 1, height - 2, 4)
-        if fillobject is not None:
-            for y in range(y1 + 1, y1 + height - 1):
-                self.draw_line(fillobject, x1 + 1, y, width - 2, 2)
+        if width <= 0 or height <= 0:
+            return
+        # the top and bottom edges are contiguous in the codemap, the left and right edges are strided slices
+        top = x1 + y1 * self.width
+        bottom = top + (height - 1) * self.width
+        if top < 0 or bottom + width > len(self.codemap):
+            raise IndexError("rectangle extends outside of the cave")
+        self.codemap[top: top + width] = self.codemap[bottom: bottom + width] = bytes((obj,)) * width
+        self.codemap[top + self.width: bottom: self.width] = \
+            self.codemap[top + self.width + width - 1: bottom + width - 1: self.width] = bytes((obj,)) * max(height - 2, 0)
+        if fillobject is not None and width > 2:
+            fill = bytes((fillobject,)) * (width - 2)
+            for offset in range(top + self.width + 1, bottom, self.width):
+                self.codemap[offset: offset + width - 2] = fill
 
     def draw_line(self, obj: int, x: int, y: int, length: int, direction: int) -> None:
-        dx, dy = [
-            (0, -1),
-            (1, -1),
-            (1, 0),
-            (1, 1),
-            (0, 1),
-            (-1, 1),
-            (-1, 0),
-            (-1, -1)][direction]
-        for _ in range(length):
-            self.draw_single(obj, x, y)
-            x += dx
-            y += dy
+        if length <= 0:
+            return
+        dx, dy = C64_DIRECTIONS[direction]
+        # the cells of the line are evenly spaced in the codemap, so it can be drawn as a single slice assignment
+        start = x + y * self.width
+        step = dx + dy * self.width
+        if step < 0:
+            # every cell gets the same object so just draw the line the other way around, from its end point
+            start += (length - 1) * step
+            step = -step
+        end = start + (length - 1) * step + 1
+        if start < 0 or end > len(self.codemap):
+            raise IndexError("line extends outside of the cave")
+        self.codemap[start: end: step] = bytes((obj,)) * length
 
     def draw_single(self, obj: int, x: int, y: int) -> None:
         self.codemap[x + y * self.width] = obj
 
+    # the drawing method and the instruction length in bytes for each of the 4 kinds of C-64 cave instructions:
+    # single object, line (length, direction), filled rectangle (width, height, fill object), rectangle (width, height)
+    instructions = ((draw_single, 3), (draw_line, 5), (draw_rectangle, 6), (draw_rectangle, 5))
+
+
+def _random_fill(seed: int, random_objects: Sequence[int], random_probabilities: Sequence[int], width: int, height: int) -> bytearray:
+    # Creates the cave's codemap: a STEEL boundary around objects chosen by the Boulder Dash random generator.
+    # The object in a cell only depends on the random number drawn for it, so the (object, probability) pairs
+    # are turned into a table with the object for each of the 256 possible random numbers (later pairs take precedence).
+    objects_table = bytearray(b"\x01") * 256    # DIRT
+    for randomobj, randomprob in zip(random_objects, random_probabilities):
+        objects_table[:randomprob] = bytes((randomobj,)) * randomprob
+    codemap = bytearray(b"\x07") * (width * height)     # STEEL
+    codemap[width: width * (height - 1)] = _random_numbers(seed, width * (height - 2)).translate(objects_table)
+    # the random generator also ran for the leftmost and rightmost columns, put the boundary back there
+    codemap[::width] = codemap[width - 1::width] = bytearray(b"\x07") * height
+    return codemap
+
+
+@functools.lru_cache(maxsize=256)
+def _random_numbers(seed: int, count: int) -> bytes:
+    # The sequence of random numbers produced by the Boulder Dash pseudo random generator, started with seeds (0, seed).
+    # Every step updates the two seeds (0..255); the carries are taken from bit 8 of the intermediate results.
+    # The sequence only depends on the seed, and most of the built-in caves share a seed, so it is cached.
+    numbers = bytearray(count)
+    seed0, seed1 = 0, seed
+    for i in range(count):
+        tmp2 = seed1 >> 1
+        result = seed1 + ((seed1 & 0x01) << 7)
+        result = (result & 0xFF) + (result >> 8) + 0x13
+        seed1 = result & 0xFF
+        result = seed0 + (result >> 8) + ((seed0 & 0x01) << 7)
+        seed0 = ((result & 0xFF) + (result >> 8) + tmp2) & 0xFF
+        numbers[i] = seed0
+    return bytes(numbers)
+
 
 class CaveSet:
     def __init__(self, external_bdcff_file: str=None, caveclass: type=None) -> None:
@@ -576,7 +522,10 @@ class CaveSet:
         else:
             cave.colors.border = bdcff.color_border
         # convert the bdcff map
-        cave.map = [BDCFFOBJECTS[x] for line in bdcff.map.maplines for x in line]
+        codes = "".join(bdcff.map.maplines).encode("latin-1", "replace").translate(BDCFFSYMBOL_CODES)
+        if 0xff in codes:
+            raise ValueError("invalid map symbol encountered in cave " + bdcff.name)
+        cave.map = list(map(BDCFFOBJECTS_TABLE.__getitem__, codes))
         return cave
 
 
@@ -608,3 +557,55 @@ BDCFFOBJECTS = {
     'F': (objects.VOODOO, Direction.NOWHERE),
     's': (objects.SLIME, Direction.NOWHERE)
 }
+
+# the BDCFF map symbols translated into an index in the table of their objects (0xff for unknown symbols)
+BDCFFOBJECTS_TABLE = tuple(BDCFFOBJECTS.values())
+BDCFFSYMBOL_CODES = bytes("".join(BDCFFOBJECTS).find(chr(c)) & 0xff for c in range(256))
+
+
+# C-64 cave map codes and the objects we recognise them as
+C64OBJECTS = {
+    0x00: (objects.EMPTY, Direction.NOWHERE),
+    0x01: (objects.DIRT, Direction.NOWHERE),
+    0x02: (objects.BRICK, Direction.NOWHERE),
+    0x03: (objects.MAGICWALL, Direction.NOWHERE),
+    0x04: (objects.OUTBOXCLOSED, Direction.NOWHERE),
+    0x05: (objects.OUTBOXBLINKING, Direction.NOWHERE),
+    0x07: (objects.STEEL, Direction.NOWHERE),
+    0x08: (objects.FIREFLY, Direction.LEFT),
+    0x09: (objects.FIREFLY, Direction.UP),
+    0x0a: (objects.FIREFLY, Direction.RIGHT),
+    0x0b: (objects.FIREFLY, Direction.DOWN),
+    0x10: (objects.BOULDER, Direction.NOWHERE),
+    0x12: (objects.BOULDER, Direction.NOWHERE),
+    0x14: (objects.DIAMOND, Direction.NOWHERE),
+    0x16: (objects.DIAMOND, Direction.NOWHERE),
+    0x25: (objects.INBOXBLINKING, Direction.NOWHERE),
+    0x30: (objects.BUTTERFLY, Direction.DOWN),
+    0x31: (objects.BUTTERFLY, Direction.LEFT),
+    0x32: (objects.BUTTERFLY, Direction.UP),
+    0x33: (objects.BUTTERFLY, Direction.RIGHT),
+    0x38: (objects.ROCKFORD, Direction.NOWHERE),
+    0x3a: (objects.AMOEBA, Direction.NOWHERE)
+}
+
+# the C-64 conversion reuses the (object, direction) tuples of the BDCFF symbols where possible,
+# so that all map cells containing the same thing share a single tuple object
+_INTERNED_CELLS = {cell: cell for cell in BDCFFOBJECTS.values()}
+C64OBJECTS = {code: _INTERNED_CELLS.setdefault(cell, cell) for code, cell in C64OBJECTS.items()}
+EMPTY_CELL = _INTERNED_CELLS[(objects.EMPTY, Direction.NOWHERE)]
+
+# the same conversion as a lookup table directly indexed by the map code (None for invalid codes)
+C64OBJECTS_TABLE = tuple(C64OBJECTS.get(code) for code in range(256))
+
+# the (dx, dy) steps of the 8 line directions used in the C-64 cave data
+C64_DIRECTIONS = (
+    (0, -1),
+    (1, -1),
+    (1, 0),
+    (1, 1),
+    (0, 1),
+    (-1, 1),
+    (-1, 0),
+    (-1, -1)
+)
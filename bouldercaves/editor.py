@@ -7,9 +7,12 @@ Written by Irmen de Jong (irmen@razorvine.net)
 License: GNU GPL 3.0, see LICENSE
 """
 
+import io
 import os
 import sys
 import random
+import operator
+import functools
 import datetime
 import tkinter
 import tkinter.messagebox
@@ -44,6 +47,7 @@ class ScrollableImageSelector(tkinter.Frame):
         self.treeview.bind("<Double-Button-1>", self.on_selected_doubleclick)
         self.selected_object = objects.BOULDER
         self.selected_erase_object = objects.EMPTY
+        self.populated_names = []     # type: List[str]
         f = tkinter.Frame(master)
         tkinter.Label(f, text=" Draw: \n(Lmb)").grid(row=0, column=0)
         self.draw_label = tkinter.Label(f)
@@ -79,11 +83,17 @@ class ScrollableImageSelector(tkinter.Frame):
                 break
 
     def populate(self, rows: List) -> None:
-        for row in self.treeview.get_children():
-            self.treeview.delete(row)
-        for image, name in rows:
-            self.treeview.insert("", tkinter.END, image=image, values=(name,))
-        self.treeview.configure(height=min(18, len(rows)))
+        names = [name for image, name in rows]
+        if names == self.populated_names:
+            # same objects as before, just update the images of the existing rows
+            for item, (image, name) in zip(self.treeview.get_children(), rows):
+                self.treeview.item(item, image=image)
+        else:
+            self.treeview.delete(*self.treeview.get_children())
+            for image, name in rows:
+                self.treeview.insert("", tkinter.END, image=image, values=(name,))
+            self.treeview.configure(height=min(18, len(rows)))
+            self.populated_names = names
         self.draw_label.configure(image=self.listener.tile_images[EDITOR_OBJECTS[self.selected_object]])
         self.erase_label.configure(image=self.listener.tile_images[EDITOR_OBJECTS[self.selected_erase_object]])
 
@@ -95,44 +105,65 @@ class Cave(BaseCave):
             self.map = [(objects.EMPTY, Direction.NOWHERE)] * self.width * self.height
         self.snapshot()
         # draw the map into the canvas.
-        for y in range(0, self.height):
-            for x in range(0, self.width):
-                self.editor.set_canvas_tile(x, y, EDITOR_OBJECTS[self.map[x + self.width * y][0]])
+        set_canvas_tile = self.editor.set_canvas_tile
+        for i, (obj, _) in enumerate(self.map):
+            y, x = divmod(i, self.width)
+            set_canvas_tile(x, y, EDITOR_OBJECTS[obj])
 
     def __setitem__(self, xy: Tuple[int, int], thing: Tuple[GameObject, Direction]) -> None:
         x, y = xy
+        self.put(x, y, self.default_direction(thing))
+
+    def put(self, x: int, y: int, thing: Tuple[GameObject, Direction]) -> None:
+        # sets a cell that is known to be valid (and has its default direction), without further checks
+        self.map[x + self.width * y] = thing
+        self.editor.set_canvas_tile(x, y, EDITOR_OBJECTS[thing[0]])
+
+    def __getitem__(self, xy: Tuple[int, int]) -> Tuple[GameObject, Direction]:
+        x, y = xy
+        return self.map[x + self.width * y]
+
+    @staticmethod
+    def default_direction(thing: Tuple[GameObject, Direction]) -> Tuple[GameObject, Direction]:
         obj, direction = thing
         assert isinstance(obj, GameObject) and isinstance(direction, Direction)
         if direction == Direction.NOWHERE:
             if obj in (objects.BUTTERFLY, objects.ALTBUTTERFLY):
-                direction = Direction.DOWN      # @todo also support other default directions
+                return obj, Direction.DOWN      # @todo also support other default directions
             elif obj in (objects.FIREFLY, objects.ALTFIREFLY):
-                direction = Direction.LEFT      # @todo also support other default directions
-        self.map[x + self.width * y] = (obj, direction)
-        self.editor.set_canvas_tile(x, y, EDITOR_OBJECTS[obj])
-
-    def __getitem__(self, xy: Tuple[int, int]) -> Tuple[GameObject, Direction]:
-        x, y = xy
-        return self.map[x + self.width * y]
+                return obj, Direction.LEFT      # @todo also support other default directions
+        return thing
 
     def horiz_line(self, x: int, y: int, length: int, thing: Tuple[GameObject, Direction]) -> None:
-        for xx in range(x, x + length):
-            self[xx, y] = thing
+        if length > 0:
+            assert 0 <= x and x + length <= self.width and 0 <= y < self.height
+            thing = self.default_direction(thing)
+            offset = x + self.width * y
+            self.map[offset: offset + length] = [thing] * length
+            tile = EDITOR_OBJECTS[thing[0]]
+            for xx in range(x, x + length):
+                self.editor.set_canvas_tile(xx, y, tile)
 
     def vert_line(self, x: int, y: int, length: int, thing: Tuple[GameObject, Direction]) -> None:
-        for yy in range(y, y + length):
-            self[x, yy] = thing
+        if length > 0:
+            assert 0 <= x < self.width and 0 <= y and y + length <= self.height
+            thing = self.default_direction(thing)
+            offset = x + self.width * y
+            self.map[offset: offset + self.width * length: self.width] = [thing] * length
+            tile = EDITOR_OBJECTS[thing[0]]
+            for yy in range(y, y + length):
+                self.editor.set_canvas_tile(x, yy, tile)
 
     def snapshot(self) -> None:
         self.map_snapshot = self.map.copy()
 
     def restore(self) -> None:
         if self.map_snapshot:
-            for y in range(self.height):
-                for x in range(self.width):
-                    obj, direction = self.map_snapshot[x + self.width * y]
-                    self[x, y] = (obj, direction)
-                    self.editor.set_canvas_tile(x, y, EDITOR_OBJECTS[obj])
+            # only the cells that differ from the snapshot have to be set (and redrawn)
+            for i, (cell, snapshot_cell) in enumerate(zip(self.map, self.map_snapshot)):
+                if cell != snapshot_cell:
+                    y, x = divmod(i, self.width)
+                    self.put(x, y, snapshot_cell)
 
 
 # the objects available in the editor, with their tile number that is displayed
@@ -157,6 +188,9 @@ EDITOR_OBJECTS = {
     objects.VOODOO: objects.VOODOO.tile()
 }
 
+# the Bdcff map symbol for every (object, direction) cell, for saving the cave
+BDCFFSYMBOLS = {cell: symbol for symbol, cell in BDCFFOBJECTS.items()}
+
 
 class EditorWindow(tkinter.Tk):
     visible_columns = 40
@@ -166,6 +200,7 @@ class EditorWindow(tkinter.Tk):
     def __init__(self) -> None:
         super().__init__()
         self.geometry("+200+40")
+        background = self.cget("background")
         title = "Boulder Caves Editor {version:s} - by Irmen de Jong".format(version=__version__)
         self.wm_title(title)
         self.appicon = tkinter.PhotoImage(data=pkgutil.get_data(__name__, "gfx/gdash_icon_48.gif"))
@@ -242,9 +277,9 @@ class EditorWindow(tkinter.Tk):
         tkinter.Entry(f, width=8, textvariable=self.cavediamondvaluenorm_var).grid(column=1, row=1, pady=2)
         tkinter.Entry(f, width=8, textvariable=self.cavediamondvalueextra_var).grid(column=1, row=2, pady=2)
         tkinter.Checkbutton(f, text=" this is an Intermission.", variable=self.caveintermission_var,
-                            selectcolor=self.cget("background")).grid(column=0, row=3, sticky=tkinter.W, pady=2)
+                            selectcolor=background).grid(column=0, row=3, sticky=tkinter.W, pady=2)
         tkinter.Checkbutton(f, text=" border wrap-around.", variable=self.cavewraparound_var,
-                            selectcolor=self.cget("background")).grid(column=0, row=4, sticky=tkinter.W, pady=2)
+                            selectcolor=background).grid(column=0, row=4, sticky=tkinter.W, pady=2)
         f.pack(side=tkinter.LEFT, padx=16, anchor=tkinter.N)
 
         f = tkinter.Frame(self.bottomframe)
@@ -278,7 +313,7 @@ class EditorWindow(tkinter.Tk):
         lf.pack(fill=tkinter.X, pady=4)
         lf = tkinter.LabelFrame(buttonsframe, text="Commodore-64 colors")
         self.c64colors_var = tkinter.IntVar()
-        c64_check = tkinter.Checkbutton(lf, text="Enable retro palette", variable=self.c64colors_var, selectcolor=self.cget("background"),
+        c64_check = tkinter.Checkbutton(lf, text="Enable retro palette", variable=self.c64colors_var, selectcolor=background,
                                         command=lambda: self.c64_colors_switched(self.c64colors_var.get()))
         c64_check.grid(column=0, row=0)
         self.c64random_button = tkinter.Button(lf, text="Random", state=tkinter.DISABLED, command=self.c64_colors_randomize)
@@ -307,10 +342,11 @@ class EditorWindow(tkinter.Tk):
         self.canvas.bind("<Button-3>", self.mousebutton_right)
         self.canvas.bind("<Motion>", self.mouse_motion)
         self.protocol("WM_DELETE_WINDOW", self.destroy)
-        self.c_tiles = []      # type: List[str]
+        self.c_tiles = []      # type: List[int]
+        self.c_tiles_columns = self.c_tiles_rows = 0    # size of the grid of tiles on the canvas
+        self.c_tiles_pending = {}   # type: Dict[int, int]
         self.tile_images = []  # type: List[tkinter.PhotoImage]
         self.tile_images_small = []   # type: List[tkinter.PhotoImage]
-        self.canvas_tag_to_tilexy = {}      # type: Dict[int, Tuple[int, int]]
         self.c64colors = False
         self.create_tile_images(Palette())
         self.wipe(False)
@@ -357,10 +393,9 @@ class EditorWindow(tkinter.Tk):
 
     def keypress(self, event) -> None:
         if event.char == 'f':
-            current = self.canvas.find_withtag(tkinter.CURRENT)
+            current = self.event_tile_xy(event)
             if current:
-                tx, ty = self.canvas_tag_to_tilexy[current[0]]
-                self.flood_fill(tx, ty, (self.imageselector.selected_object, Direction.NOWHERE))
+                self.flood_fill(current[0], current[1], (self.imageselector.selected_object, Direction.NOWHERE))
         elif event.char == 'r':
             obj, direction = self.imageselector.selected_object, Direction.NOWHERE
             for _ in range(10):
@@ -372,13 +407,13 @@ class EditorWindow(tkinter.Tk):
         elif event.char == 'u':
             self.restore()
         elif event.keysym.startswith("Shift"):
-            current = self.canvas.find_withtag(tkinter.CURRENT)
+            current = self.event_tile_xy(event)
             if current:
-                self.snap_tile_xy = self.canvas_tag_to_tilexy[current[0]]
+                self.snap_tile_xy = current
         elif event.keysym.startswith("Control"):
-            current = self.canvas.find_withtag(tkinter.CURRENT)
+            current = self.event_tile_xy(event)
             if current:
-                self.snap_tile_diagonal = self.canvas_tag_to_tilexy[current[0]]
+                self.snap_tile_diagonal = current
 
     def keyrelease(self, event) -> None:
         if event.keysym.startswith("Shift"):
@@ -388,14 +423,14 @@ class EditorWindow(tkinter.Tk):
 
     def mousebutton_left(self, event) -> None:
         self.canvas.focus_set()
-        current = self.canvas.find_withtag(tkinter.CURRENT)
+        current = self.event_tile_xy(event)
         if current:
             if event.state & 1:
-                self.snap_tile_xy = self.canvas_tag_to_tilexy[current[0]]
+                self.snap_tile_xy = current
             if event.state & 4:
-                self.snap_tile_diagonal = self.canvas_tag_to_tilexy[current[0]]
+                self.snap_tile_diagonal = current
             if self.imageselector.selected_object:
-                x, y = self.canvas_tag_to_tilexy[current[0]]
+                x, y = current
                 if self.selected_tile_allowed(x, y):
                     self.cave[x, y] = (self.imageselector.selected_object, Direction.NOWHERE)
 
@@ -403,18 +438,17 @@ class EditorWindow(tkinter.Tk):
         pass
 
     def mousebutton_right(self, event) -> None:
-        current = self.canvas.find_withtag(tkinter.CURRENT)
+        current = self.event_tile_xy(event)
         if current:
-            x, y = self.canvas_tag_to_tilexy[current[0]]
+            x, y = current
             if self.selected_tile_allowed(x, y):
                 self.cave[x, y] = (self.imageselector.selected_erase_object, Direction.NOWHERE)
 
     def mouse_motion(self, event) -> None:
-        cx = self.canvas.canvasx(event.x)
-        cy = self.canvas.canvasy(event.y)
-        current = self.canvas.find_closest(cx, cy)
+        current = self.event_tile_xy(event)
         if current:
-            x, y = self.canvas_tag_to_tilexy[current[0]]
+            x, y = current
+            c_tile = self.c_tiles[x + self.c_tiles_columns * y]
             if self.selected_tile_allowed(x, y):
                 if event.state & 0x100:
                     # left mouse button drag
@@ -425,13 +459,26 @@ class EditorWindow(tkinter.Tk):
                 else:
                     if not self._use_active_image():
                         orig_tile = EDITOR_OBJECTS[self.cave[x, y][0]]
-                        self.canvas.itemconfigure(current[0], image=self.tile_images[EDITOR_OBJECTS[self.imageselector.selected_object]])
-                        self.after(60, lambda ot=orig_tile, ci=current[0]: self.canvas.itemconfigure(ci, image=self.tile_images[ot]))
+                        self.canvas.itemconfigure(c_tile, image=self.tile_images[EDITOR_OBJECTS[self.imageselector.selected_object]])
+                        self.after(60, lambda ot=orig_tile, ci=c_tile: self.canvas.itemconfigure(ci, image=self.tile_images[ot]))
             else:
                 # show the 'denied' tile briefly
                 orig_tile = EDITOR_OBJECTS[self.cave[x, y][0]]
-                self.canvas.itemconfigure(current[0], image=self.tile_images[objects.EDIT_CROSS.tile()])
-                self.after(60, lambda: self.canvas.itemconfigure(current[0], image=self.tile_images[orig_tile]))
+                self.canvas.itemconfigure(c_tile, image=self.tile_images[objects.EDIT_CROSS.tile()])
+                self.after(60, lambda: self.canvas.itemconfigure(c_tile, image=self.tile_images[orig_tile]))
+
+    def event_tile_xy(self, event) -> Optional[Tuple[int, int]]:
+        # the tile under the mouse pointer, if any. The tiles form a regular grid on the canvas so it is calculated directly.
+        # Key events report the pointer position even when it is outside of the canvas (or -1 when in another window),
+        # and that position must not be mapped onto the scrolled canvas.
+        if not (0 <= event.x < self.canvas.winfo_width() and 0 <= event.y < self.canvas.winfo_height()):
+            return None
+        cx = self.canvas.canvasx(event.x) / self.canvas_scale
+        cy = self.canvas.canvasy(event.y) / self.canvas_scale
+        x, y = tiles.pixels2tile(cx, cy)
+        if 0 <= x < self.c_tiles_columns and 0 <= y < self.c_tiles_rows:
+            return x, y
+        return None
 
     def selected_tile_allowed(self, x: int, y: int) -> bool:
         if self.snap_tile_xy:
@@ -442,10 +489,14 @@ class EditorWindow(tkinter.Tk):
         return True
 
     def create_tile_images(self, colors: Palette) -> None:
-        source_images = tiles.load_sprites(colors if self.c64colors else None, scale=self.canvas_scale)
-        self.tile_images = [tkinter.PhotoImage(data=image) for image in source_images]
-        source_images = tiles.load_sprites(colors if self.c64colors else None, scale=1)
-        self.tile_images_small = [tkinter.PhotoImage(data=image) for image in source_images]
+        # once created, the images are reloaded in place so everything that displays them is updated by Tk itself
+        for images, scale in ((self.tile_images, self.canvas_scale), (self.tile_images_small, 1)):
+            source_images = tiles.load_sprites(colors if self.c64colors else None, scale=scale)
+            if len(images) == len(source_images):
+                for image, data in zip(images, source_images):
+                    image.configure(data=data)
+            else:
+                images[:] = [tkinter.PhotoImage(data=data) for data in source_images]
 
     def create_canvas_playfield(self, width: int, height: int) -> None:
         # create the images on the canvas for all tiles (fixed position)
@@ -453,37 +504,50 @@ class EditorWindow(tkinter.Tk):
             raise ValueError("invalid playfield/cave width or height (4-100)")
         self.playfield_columns = width
         self.playfield_rows = height
-        self.canvas.delete(tkinter.ALL)
-        self.c_tiles.clear()
-        self.canvas_tag_to_tilexy.clear()
+        self.c_tiles_pending.clear()
         selected_tile = EDITOR_OBJECTS[self.imageselector.selected_object]
         active_image = self.tile_images[selected_tile] if self._use_active_image() else None
+        cavemap, tile_images, create_image = self.cave.map, self.tile_images, self.canvas.create_image
+        if self.c_tiles and (width, height) == (self.c_tiles_columns, self.c_tiles_rows):
+            # the playfield has the same size, reuse the tiles that are already on the canvas
+            for c_tile, (obj, _) in zip(self.c_tiles, cavemap):
+                self.canvas.itemconfigure(c_tile, image=tile_images[EDITOR_OBJECTS[obj]])
+            if active_image:
+                self.canvas.itemconfigure("tile", activeimage=active_image)
+            return
+        self.canvas.delete(tkinter.ALL)
+        self.c_tiles.clear()
+        self.c_tiles_columns, self.c_tiles_rows = width, height
         for y in range(self.playfield_rows):
             for x in range(self.playfield_columns):
                 sx, sy = tiles.tile2pixels(x, y)
-                obj, direction = self.cave[x, y]
-                ctile = self.canvas.create_image(sx * self.canvas_scale, sy * self.canvas_scale,
-                                                 image=self.tile_images[EDITOR_OBJECTS[obj]],
-                                                 activeimage=active_image, anchor=tkinter.NW, tags="tile")
+                obj = cavemap[x + self.cave.width * y][0]
+                ctile = create_image(sx * self.canvas_scale, sy * self.canvas_scale, image=tile_images[EDITOR_OBJECTS[obj]],
+                                     activeimage=active_image, anchor=tkinter.NW, tags="tile")
                 self.c_tiles.append(ctile)
-                self.canvas_tag_to_tilexy[ctile] = (x, y)
 
     def tile_selection_changed(self, object: GameObject, tile: int) -> None:
         self.canvas.focus_set()
         if self._use_active_image():
-            self.config(cursor="watch")
-            self.update()
-            image = self.tile_images[tile]
-            for c_tile in self.c_tiles:
-                self.canvas.itemconfigure(c_tile, activeimage=image)
-            self.config(cursor="")
+            self.canvas.itemconfigure("tile", activeimage=self.tile_images[tile])
 
     def tile_erase_selection_changed(self, object: GameObject, tile: int) -> None:
         pass
 
     def set_canvas_tile(self, x: int, y: int, tile: int) -> None:
-        c_tile = self.canvas.find_closest(x * 16 * self.canvas_scale, y * 16 * self.canvas_scale)
-        self.canvas.itemconfigure(c_tile, image=self.tile_images[tile])
+        # the canvas tiles are created row by row so they can be indexed directly.
+        # (while a new or resized cave is being set up, the canvas doesn't match it yet: it is recreated afterwards)
+        # the tile changes are collected and applied when the event loop is idle,
+        # so a burst of changes (or the same tile changing repeatedly) only updates the canvas once.
+        if x < self.c_tiles_columns and y < self.c_tiles_rows:
+            if not self.c_tiles_pending:
+                self.after_idle(self.update_canvas_tiles)
+            self.c_tiles_pending[self.c_tiles[x + self.c_tiles_columns * y]] = tile
+
+    def update_canvas_tiles(self) -> None:
+        for c_tile, tile in self.c_tiles_pending.items():
+            self.canvas.itemconfigure(c_tile, image=self.tile_images[tile])
+        self.c_tiles_pending.clear()
 
     def flood_fill(self, x: int, y: int, newthing: Tuple[GameObject, Direction]) -> None:
         # scanline floodfill algorithm using a stack
@@ -492,26 +556,31 @@ class EditorWindow(tkinter.Tk):
             return
         self.config(cursor="watch")
         self.update()
+        # the cells are read directly from the cave map, only the changed cells go through the cave (and the canvas)
+        cavemap, width, height = self.cave.map, self.cave.width, self.cave.height
+        newthing = self.cave.default_direction(newthing)
         stack = [(x, y)]
         while stack:
             x, y = stack.pop()
+            row = y * width
             x1 = x
-            while x1 >= 0 and self.cave[x1, y][0] == oldthing:
+            while x1 >= 0 and cavemap[row + x1][0] == oldthing:
                 x1 -= 1
             x1 += 1
             span_above = span_below = False
-            while x1 < self.cave.width and self.cave[x1, y][0] == oldthing:
-                self.cave[x1, y] = newthing
-                if not span_above and y > 0 and self.cave[x1, y-1][0] == oldthing:
-                    stack.append((x1, y-1))
-                    span_above = True
-                elif span_above and y > 0 and self.cave[x1, y-1][0] != oldthing:
-                    span_above = False
-                if not span_below and y < self.cave.height - 1 and self.cave[x1, y+1][0] == oldthing:
-                    stack.append((x1, y+1))
-                    span_below = True
-                elif span_below and y < self.cave.height - 1 and self.cave[x1, y+1][0] != oldthing:
-                    span_below = False
+            while x1 < width and cavemap[row + x1][0] == oldthing:
+                self.cave.put(x1, y, newthing)
+                if y > 0:
+                    # push only the first cell of every run of matching cells in the row above
+                    above = cavemap[row - width + x1][0] == oldthing
+                    if above and not span_above:
+                        stack.append((x1, y - 1))
+                    span_above = above
+                if y < height - 1:
+                    below = cavemap[row + width + x1][0] == oldthing
+                    if below and not span_below:
+                        stack.append((x1, y + 1))
+                    span_below = below
                 x1 += 1
         self.config(cursor="")
 
@@ -541,15 +610,16 @@ class EditorWindow(tkinter.Tk):
 
     def do_random_fill(self, rseed: int, randomprobs: Tuple[int, int, int, int], randomobjs: Tuple[str, str, str, str]) -> None:
         editor_objects_by_name = {obj.name.lower(): obj for obj in EDITOR_OBJECTS}
-        randomseeds = [0, rseed]
-        for y in range(1, self.playfield_rows - 1):
-            for x in range(0, self.playfield_columns):
-                objname = objects.DIRT.name.lower()
-                C64Cave.bdrandom(randomseeds)
-                for randomobj, randomprob in zip(randomobjs, randomprobs):
-                    if randomseeds[0] < randomprob:
-                        objname = randomobj.lower()
-                self.cave[x, y] = (editor_objects_by_name[objname], Direction.NOWHERE)
+        # the cell only depends on the random number drawn for it, so make a table with the cell for all 256 of them
+        # (the objects later in the list take precedence)
+        randomcells = [(objects.DIRT, Direction.NOWHERE)] * 256
+        for randomobj, randomprob in zip(randomobjs, randomprobs):
+            randomcell = self.cave.default_direction((editor_objects_by_name[randomobj.lower()], Direction.NOWHERE))
+            randomcells[:randomprob] = [randomcell] * randomprob
+        width = self.playfield_columns
+        for i, number in enumerate(C64Cave.bdrandom_sequence(rseed, width * (self.playfield_rows - 2)), start=width):
+            y, x = divmod(i, width)
+            self.cave.put(x, y, randomcells[number])
         self.cave_steel_border()
         self.randomize_initial_values = (rseed, randomprobs, randomobjs)
 
@@ -585,9 +655,7 @@ class EditorWindow(tkinter.Tk):
 
     def apply_new_palette(self, colors: Palette) -> None:
         if self.c64colors:
-            self.create_tile_images(colors)
-            self.populate_imageselector()
-            self.create_canvas_playfield(self.playfield_columns, self.playfield_rows)
+            self.create_tile_images(colors)     # this also updates the canvas and the object selector
             self.canvas.configure(background="#{:06x}".format(colors.rgb_border))
 
     def load(self):
@@ -661,13 +729,9 @@ class EditorWindow(tkinter.Tk):
         c = self.cave.colors
         cave.color_border, cave.color_screen, cave.color_fg1, cave.color_fg2, cave.color_fg3, cave.color_amoeba, cave.color_slime = \
             c.border, c.screen, c.fg1, c.fg2, c.fg3, c.amoeba, c.slime
-        BDCFFSYMBOL = {(obj, direction): symbol for symbol, (obj, direction) in BDCFFOBJECTS.items()}
+        width = self.cave.width
         for y in range(0, self.cave.height):
-            mapline = ""
-            for x in range(0, self.cave.width):
-                obj, direction = self.cave[x, y]
-                mapline += BDCFFSYMBOL[obj, direction]
-            cave.map.maplines.append(mapline)
+            cave.map.maplines.append("".join(map(BDCFFSYMBOLS.__getitem__, self.cave.map[y * width: (y + 1) * width])))
         caveset.caves.append(cave)
         gamefile = gamefile or tkinter.filedialog.asksaveasfilename(title="Save single cave as", defaultextension=".bdcff",
                                                                     filetypes=[("boulderdash", ".bdcff"),
@@ -675,8 +739,12 @@ class EditorWindow(tkinter.Tk):
                                                                                ("text", ".txt")],
                                                                     parent=self.buttonsframe)
         if gamefile:
+            # the caveset is written in many small pieces, collect them in memory and write the file in one go.
+            # (this also means the file isn't left half-written if there's an error in the caveset)
+            output = io.StringIO()
+            caveset.write(output)
             with open(gamefile, "wt") as out:
-                caveset.write(out)
+                out.write(output.getvalue())
             return True
         return False
 
@@ -684,12 +752,12 @@ class EditorWindow(tkinter.Tk):
         # check that the level is sane:
         # we should have at least 1 inbox and at least 1 outbox.
         # (edge is no longer checked, you should take care of a closed cave yourself!)
-        inbox_count = len([x for x, _ in self.cave.map if x == objects.INBOXBLINKING])
-        outbox_count = len([x for x, _ in self.cave.map if x in (objects.OUTBOXCLOSED, objects.OUTBOXBLINKING, objects.OUTBOXHIDDEN)])
+        # only the presence of the objects matters, so collect the different objects in the cave in a single pass.
+        cave_objects = set(map(operator.itemgetter(0), self.cave.map))
         messages = []
-        if inbox_count <= 0:
+        if objects.INBOXBLINKING not in cave_objects:
             messages.append("There should be at least one INBOX.")
-        if outbox_count <= 0:
+        if cave_objects.isdisjoint((objects.OUTBOXCLOSED, objects.OUTBOXBLINKING, objects.OUTBOXHIDDEN)):
             messages.append("There should be at least one OUTBOX.")
         if messages:
             messages.insert(0, "There are some problems with the current cave:")
@@ -704,8 +772,7 @@ class EditorWindow(tkinter.Tk):
             # launch the game in a separate process
             import subprocess
             from . import game
-            env = os.environ.copy()
-            env["PYTHONPATH"] = sys.path[0]
+            env = dict(os.environ, PYTHONPATH=sys.path[0])
             parameters = [sys.executable, "-m", game.__name__, "--synth", "--playtest", "--game", gamefile]
             if self.c64colors_var.get():
                 parameters.append("--c64colors")
@@ -722,6 +789,7 @@ class RandomizeDialog(Dialog):
     def __init__(self, parent, title: str, editor: EditorWindow, initial_values: Optional[Tuple]) -> None:
         self.editor = editor
         self.initial_values = initial_values
+        self.values = []   # type: List[int]
         super().__init__(parent=parent, title=title)
 
     def body(self, master: tkinter.Widget) -> tkinter.Widget:
@@ -744,47 +812,48 @@ class RandomizeDialog(Dialog):
         tkinter.Label(f, text="Random probability (0-255): ").grid(row=2, column=0)
         tkinter.Label(f, text="Random probability (0-255): ").grid(row=3, column=0)
         tkinter.Label(f, text="Random probability (0-255): ").grid(row=4, column=0)
-        rseed = tkinter.Entry(f, textvariable=self.rseed_var, width=4, font="fixed")
-        rp1 = tkinter.Entry(f, textvariable=self.rp1_var, width=4, font="fixed")
-        rp2 = tkinter.Entry(f, textvariable=self.rp2_var, width=4, font="fixed")
-        rp3 = tkinter.Entry(f, textvariable=self.rp3_var, width=4, font="fixed")
-        rp4 = tkinter.Entry(f, textvariable=self.rp4_var, width=4, font="fixed")
+        # Tk checks every keystroke, so only numbers 0-255 can be typed in the entries
+        vcmd = (self.register(self.validate_number), "%P")
+        rseed = tkinter.Entry(f, textvariable=self.rseed_var, width=4, font="fixed", validate="key", validatecommand=vcmd)
+        rp1 = tkinter.Entry(f, textvariable=self.rp1_var, width=4, font="fixed", validate="key", validatecommand=vcmd)
+        rp2 = tkinter.Entry(f, textvariable=self.rp2_var, width=4, font="fixed", validate="key", validatecommand=vcmd)
+        rp3 = tkinter.Entry(f, textvariable=self.rp3_var, width=4, font="fixed", validate="key", validatecommand=vcmd)
+        rp4 = tkinter.Entry(f, textvariable=self.rp4_var, width=4, font="fixed", validate="key", validatecommand=vcmd)
         rseed.grid(row=0, column=1)
         rp1.grid(row=1, column=1)
         rp2.grid(row=2, column=1)
         rp3.grid(row=3, column=1)
         rp4.grid(row=4, column=1)
+        # a readonly combobox only creates its dropdown list when it is opened, an option menu creates a menu item per object
         options = sorted([obj.name.title() for obj in EDITOR_OBJECTS])
-        tkinter.OptionMenu(f, self.robj1_var, *options).grid(row=1, column=2, stick=tkinter.W)
-        tkinter.OptionMenu(f, self.robj2_var, *options).grid(row=2, column=2, stick=tkinter.W)
-        tkinter.OptionMenu(f, self.robj3_var, *options).grid(row=3, column=2, stick=tkinter.W)
-        tkinter.OptionMenu(f, self.robj4_var, *options).grid(row=4, column=2, stick=tkinter.W)
+        width = max(len(option) for option in options)
+        for row, robj_var in enumerate((self.robj1_var, self.robj2_var, self.robj3_var, self.robj4_var), start=1):
+            tkinter.ttk.Combobox(f, textvariable=robj_var, values=options, state="readonly", width=width)\
+                .grid(row=row, column=2, stick=tkinter.W)
         f.pack()
         tkinter.Label(master, text="\n\nWARNING: DOING THIS WILL WIPE THE CURRENT CAVE!").pack()
         return rp1
 
+    def validate_number(self, value: str) -> bool:
+        # an entry may also be empty while it is being edited, validate() catches that one
+        return value == "" or (len(value) <= 3 and not value.strip("0123456789") and int(value) <= 255)
+
     def validate(self) -> bool:
+        # the values are read only once, apply() uses the values that were validated here
         try:
-            vs = self.rseed_var.get()
-            v1 = self.rp1_var.get()
-            v2 = self.rp1_var.get()
-            v3 = self.rp1_var.get()
-            v4 = self.rp1_var.get()
+            values = [var.get() for var in (self.rseed_var, self.rp1_var, self.rp2_var, self.rp3_var, self.rp4_var)]
         except tkinter.TclError as x:
             tkinter.messagebox.showerror("Invalid entry", str(x), parent=self)
             return False
         else:
-            if not (0 <= vs <= 255) or not (0 <= v1 <= 255) or not(0 <= v2 <= 255) or not(0 <= v3 <= 255) or not(0 <= v4 <= 255):
+            if not all(0 <= value <= 255 for value in values):
                 tkinter.messagebox.showerror("Invalid entry", "One or more of the values is invalid.", parent=self)
                 return False
+        self.values = values
         return True
 
     def apply(self) -> None:
-        vs = self.rseed_var.get()
-        v1 = self.rp1_var.get()
-        v2 = self.rp2_var.get()
-        v3 = self.rp3_var.get()
-        v4 = self.rp4_var.get()
+        vs, v1, v2, v3, v4 = self.values
         o1 = self.robj1_var.get()
         o2 = self.robj2_var.get()
         o3 = self.robj3_var.get()
@@ -792,6 +861,12 @@ class RandomizeDialog(Dialog):
         self.editor.do_random_fill(vs, (v1, v2, v3, v4), (o1, o2, o3, o4))
 
 
+@functools.lru_cache(maxsize=256)
+def contrast_color(tkcolor: str) -> str:
+    # the inverse of a '#rrggbb' color, to show text on it
+    return "#{:06x}".format(0xffffff ^ int(tkcolor[1:], 16))
+
+
 class PaletteDialog(Dialog):
     def __init__(self, parent, title: str, editor: EditorWindow, colors: Palette) -> None:
         self.editor = editor
@@ -800,53 +875,55 @@ class PaletteDialog(Dialog):
         self.palettergblabels = {}   # type: Dict[str, tkinter.Label]
         self.color_vars = {}   # type: Dict[str, tkinter.Variable]
         self.rgb_vars = {}   # type: Dict[str, tkinter.Variable]
+        self.tkcolors = []   # type: List[str]
+        self.label_colors = ("", "")   # default bg and fg of a label, to reset the rgb labels with
         super().__init__(parent=parent, title=title)
 
     def body(self, master: tkinter.Widget) -> Optional[tkinter.Widget]:
         colors = [("fg1", self.colors.fg1), ("fg2", self.colors.fg2), ("fg3", self.colors.fg3),
                   ("amoeba", self.colors.amoeba), ("slime", self.colors.slime),
                   ("screen", self.colors.screen), ("border", self.colors.border)]
+        self.tkcolors = ["#{:06x}".format(color) for color in colorpalette]
         for colornum, (name, value) in enumerate(colors):
             color_var = tkinter.StringVar(value=value)
             self.color_vars[name] = color_var
-            tkinter.Label(master, text="{:s} color: ".format(name.title())).grid(row=colornum, sticky=tkinter.E)
+            namelabel = tkinter.Label(master, text="{:s} color: ".format(name.title()))
+            namelabel.grid(row=colornum, sticky=tkinter.E)
             rf = tkinter.Frame(master)
-            for num, color in enumerate(colorpalette):
-                tkcolor = "#{:06x}".format(color)
+            # (the radio button of the current color is selected by color_var's initial value)
+            for num, tkcolor in enumerate(self.tkcolors):
                 rb = tkinter.Radiobutton(rf, variable=color_var, indicatoron=False, value=num,
                                          activebackground=tkcolor, command=lambda n=name: self.palette_color_chosen(n),
                                          offrelief=tkinter.FLAT, relief=tkinter.FLAT, overrelief=tkinter.RIDGE,
                                          bd=5, bg=tkcolor, selectcolor=tkcolor, width=2, height=1)
                 rb.pack(side=tkinter.LEFT)
-                if num == value:
-                    rb.select()
             tkinter.Label(rf, text=" or: ").pack(side=tkinter.LEFT)
             tkinter.Button(rf, text="select", command=lambda n=name: self.rgb_color_chosen(n)).pack(side=tkinter.LEFT)
             rgb_var = tkinter.IntVar()
             self.rgb_vars[name] = rgb_var
             rgb_label = tkinter.Label(rf, text="any RGB color")
             if isinstance(value, str):
-                fgtkcolor = "#{:06x}".format(0xffffff ^ int(value[1:], 16))
+                fgtkcolor = contrast_color(value)
                 rgb_label.configure(bg=value, fg=fgtkcolor)
             rgb_label.pack(side=tkinter.LEFT, expand=True, fill=tkinter.Y)
             self.palettergblabels[name] = rgb_label
             rf.grid(row=colornum, column=1, pady=4, sticky=tkinter.W)
+        self.label_colors = namelabel.cget("bg"), namelabel.cget("fg")
         return None
 
     def palette_color_chosen(self, colorname: str) -> None:
         # reset the rgb button of this color row
-        dummylabel = tkinter.Label(self)
-        self.palettergblabels[colorname].configure(bg=dummylabel.cget("bg"), fg=dummylabel.cget("fg"))
+        self.palettergblabels[colorname].configure(bg=self.label_colors[0], fg=self.label_colors[1])
         self.editor.apply_new_palette(self.palette)
 
     def rgb_color_chosen(self, colorname: str) -> None:
         color = self.color_vars[colorname].get()
         if not color.startswith("#"):
-            color = "#{:06x}".format(colorpalette[int(color)])
+            color = self.tkcolors[int(color)]
         rgbcolor = tkinter.colorchooser.askcolor(title="Choose a RGB color", parent=self, initialcolor=color)
         if rgbcolor[1] is not None:
             tkcolor = rgbcolor[1]
-            fgtkcolor = "#{:06x}".format(0xffffff ^ int(tkcolor[1:], 16))
+            fgtkcolor = contrast_color(tkcolor)
             self.color_vars[colorname].set(tkcolor)
             self.palettergblabels[colorname].configure(bg=tkcolor, fg=fgtkcolor)
             self.editor.apply_new_palette(self.palette)
@@ -856,13 +933,7 @@ class PaletteDialog(Dialog):
 
     @property
     def palette(self) -> Palette:
-        return Palette(self.color_vars["fg1"].get(),
-                       self.color_vars["fg2"].get(),
-                       self.color_vars["fg3"].get(),
-                       self.color_vars["amoeba"].get(),
-                       self.color_vars["slime"].get(),
-                       self.color_vars["screen"].get(),
-                       self.color_vars["border"].get())
+        return Palette(*(self.color_vars[name].get() for name in Palette.color_names))
 
 
 class CaveSelectionDialog(Dialog):
@@ -877,8 +948,7 @@ class CaveSelectionDialog(Dialog):
         f = tkinter.Frame(master)
         self.lb = tkinter.Listbox(f, bd=1, font="fixed", height=min(25, len(self.cavenames)),
                                   width=max(10, max(len(name) for name in self.cavenames)))
-        for name in self.cavenames:
-            self.lb.insert(tkinter.END, name)
+        self.lb.insert(tkinter.END, *self.cavenames)
         sy = tkinter.Scrollbar(f, orient=tkinter.VERTICAL, command=self.lb.yview)
         self.lb.configure(yscrollcommand=sy.set)
         self.lb.pack(side=tkinter.LEFT)
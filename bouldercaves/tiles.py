@@ -110,6 +110,10 @@ def tile2pixels(tx: int, ty: int) -> Tuple[int, int]:
     return tx * 16, ty * 16
 
 
+def pixels2tile(px: float, py: float) -> Tuple[int, int]:
+    return int(px // 16), int(py // 16)
+
+
 # sprite image is 432 sprites of 16*16 pixels, 8 per row.
 num_sprites = 432   # after these, the font tiles are placed
 
@@ -137,12 +141,9 @@ def load_sprites(c64colorpalette: Palette=None, scale: float=1.0, alt_c64tileset
             pc5 = palette.index((0, 0, 255))        # blue, slime color
             pc_bg = palette.index((0, 0, 0))        # black, background color
             assert c64colorpalette
-            palette[pc1] = (c64colorpalette.rgb_fg1 >> 16, (c64colorpalette.rgb_fg1 & 0xff00) >> 8, c64colorpalette.rgb_fg1 & 0xff)
-            palette[pc2] = (c64colorpalette.rgb_fg2 >> 16, (c64colorpalette.rgb_fg2 & 0xff00) >> 8, c64colorpalette.rgb_fg2 & 0xff)
-            palette[pc3] = (c64colorpalette.rgb_fg3 >> 16, (c64colorpalette.rgb_fg3 & 0xff00) >> 8, c64colorpalette.rgb_fg3 & 0xff)
-            palette[pc4] = (c64colorpalette.rgb_amoeba >> 16, (c64colorpalette.rgb_amoeba & 0xff00) >> 8, c64colorpalette.rgb_amoeba & 0xff)
-            palette[pc5] = (c64colorpalette.rgb_slime >> 16, (c64colorpalette.rgb_slime & 0xff00) >> 8, c64colorpalette.rgb_slime & 0xff)
-            palette[pc_bg] = (c64colorpalette.rgb_screen >> 16, (c64colorpalette.rgb_screen & 0xff00) >> 8, c64colorpalette.rgb_screen & 0xff)
+            for pc, color in ((pc1, c64colorpalette.rgb_fg1), (pc2, c64colorpalette.rgb_fg2), (pc3, c64colorpalette.rgb_fg3),
+                              (pc4, c64colorpalette.rgb_amoeba), (pc5, c64colorpalette.rgb_slime), (pc_bg, c64colorpalette.rgb_screen)):
+                palette[pc] = (color >> 16, (color >> 8) & 0xff, color & 0xff)
             palettevalues = []
             for rgb in palette:
                 palettevalues.extend(rgb)